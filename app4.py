@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 import gdown
 import os
 
+from serie_temporal import SerieRolante, figura_series_rolantes
+
 # Função para baixar o arquivo do Google Drive
 def baixar_arquivo_google_drive(url, caminho_local):
     gdown.download(url, caminho_local, quiet=False)
@@ -46,6 +48,11 @@ def carregar_dados():
 
     return clientes_df, vendas_credito_df
 
+@st.cache_resource
+def motor_series():
+    """Mantém as séries rolantes entre execuções; cada atualização agrega só as linhas novas ou alteradas"""
+    return SerieRolante(colunas={"cliente": "Cliente1", "emissao": "Dt.Emissão1", "valor": "Vl.liquido1"})
+
 def categorizar_cliente_por_faturamento(faturamento):
     if faturamento <= 10000:
         return 'Até 10 mil'
@@ -204,6 +211,14 @@ def main():
     else:
         st.write("Comentário: O índice de rotatividade está dentro da média, indicando uma eficiência razoável na cobrança das contas a receber.")
 
+    # Tendência de DSO, CEI e Giro (séries rolantes de 30, 60 e 90 dias)
+    st.subheader("Tendência de DSO, CEI e Giro")
+    serie = motor_series().atualizar(vendas_credito_df).serie(cliente_nome)
+    if serie.empty:
+        st.write("**Sem histórico de vendas para montar as séries.**")
+    else:
+        st.pyplot(figura_series_rolantes(serie))
+
     # Gráfico de pizza para totais
     fig, ax = plt.subplots(figsize=(8, 5))
     ax.pie(
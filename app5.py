@@ -1,80 +1,30 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import gdown
 import os
-import hashlib
+import time
+import uuid
 from datetime import datetime
 
+from dados import ler_dados
+from metricas import calcular_metricas
+from exportacao import exportar_metricas_carteira, exportar_titulos_cliente
+from serie_temporal import SerieRolante, figura_series_rolantes
+
 # Configuração de cache com controle de versão
 @st.cache_data(ttl=3600, show_spinner="Atualizando dados...")
 def carregar_dados():
     """Carrega dados com versionamento automático"""
     try:
-        # URLs dos arquivos (atualize com seus links)
-        url_clientes = 'https://drive.google.com/uc?id=12doumGMLErxW6j1KM5idWHAzXAH1Woqd'
-        url_vendas = 'https://drive.google.com/uc?id=1dYHZlfvZlwOhJP1cJlQRbMowoVRBY78N'
-        
-        # Gera nomes únicos baseados no conteúdo das URLs
-        hash_cli = hashlib.md5(url_clientes.encode()).hexdigest()[:8]
-        hash_vnd = hashlib.md5(url_vendas.encode()).hexdigest()[:8]
-        
-        caminho_clientes = f'clientes_{hash_cli}.xlsx'
-        caminho_vendas = f'vendas_{hash_vnd}.xlsx'
-
-        # Download condicional
-        if not os.path.exists(caminho_clientes):
-            gdown.download(url_clientes, caminho_clientes, quiet=False)
-        if not os.path.exists(caminho_vendas):
-            gdown.download(url_vendas, caminho_vendas, quiet=False)
-
-        # Carregar dados
-        clientes_df = pd.read_excel(caminho_clientes, engine='openpyxl')
-        vendas_df = pd.read_excel(caminho_vendas, engine='openpyxl')
-
-        # Padronização de colunas
-        clientes_df.columns = [
-            "Inativo", "Nro.", "Empresa", "Cliente", "Fantasia", "Referência", "Vencimento",
-            "Vl.liquido", "TD", "Nr.docto", "Dt.pagto", "Vl.pagamento", "TP", "Nr.pagamento",
-            "Conta", "Dt.Emissão", "Cobrança", "Modelo", "Negociação", "Duplicata", 
-            "Razão Social", "CNPJ/CPF", "PDD"
-        ]
-
-        vendas_df.columns = [
-            "Inativo", "Nro.", "Empresa", "Cliente", "Fantasia", "Referência", "Vencimento", 
-            "Vl.liquido", "TD", "Nr.docto", "Dt.pagto", "Vl.pagto", "TP", "Nr.pagto", 
-            "Conta", "Dt.Emissão", "Cobrança", "Modelo", "Negociação", "Duplicata", 
-            "Razão Social", "CNPJ/CPF", "PDD"
-        ]
-
-        # Processamento de datas e valores
-        for df in [clientes_df, vendas_df]:
-            df["Vencimento"] = pd.to_datetime(df["Vencimento"], errors='coerce')
-            df["Dt.Emissão"] = pd.to_datetime(df["Dt.Emissão"], errors='coerce')
-            df["Vl.liquido"] = pd.to_numeric(df["Vl.liquido"], errors='coerce')
-            df["Vl.pagto"] = pd.to_numeric(df["Vl.pagto"], errors='coerce')
-
-        clientes_df["Cliente_Fantasia"] = clientes_df["Cliente"] + " - " + clientes_df["Fantasia"]
-        
-        return clientes_df, vendas_df
-
+        return ler_dados()
     except Exception as e:
         st.error(f"Erro crítico: {str(e)}")
         st.stop()
 
-def categorizar_cliente_por_faturamento(faturamento):
-    categorias = [
-        (10000, 'Até 10 mil'),
-        (50000, '11-50 mil'),
-        (100000, '51-100 mil'),
-        (150000, '101-150 mil'),
-        (350000, '151-350 mil'),
-        (1000000, '351 mil-1 Mi'),
-        (float('inf'), 'Acima de 1 Mi')
-    ]
-    for limite, categoria in categorias:
-        if faturamento <= limite:
-            return categoria
+@st.cache_resource
+def motor_series():
+    """Mantém as séries rolantes entre execuções; cada atualização agrega só as linhas novas ou alteradas"""
+    return SerieRolante()
 
 def grafico_regua_faturamento(total_geral):
     fig, ax = plt.subplots(figsize=(10, 2))
@@ -91,29 +41,27 @@ def grafico_regua_faturamento(total_geral):
     plt.title('Posicionamento de Faturamento', pad=20)
     st.pyplot(fig)
 
-def exibir_analise_completa(clientes_filtro, vendas_cliente):
+def exibir_analise_completa(clientes_filtro, vendas_cliente, serie):
     hoje = pd.Timestamp.today()
     
     # Cálculos básicos
-    vencidos = clientes_filtro[clientes_filtro["Vencimento"] < hoje]
-    a_vencer = clientes_filtro[clientes_filtro["Vencimento"] >= hoje]
-    
-    total_vencidos = vencidos["Vl.liquido"].sum()
-    total_a_vencer = a_vencer["Vl.liquido"].sum()
-    total_geral = total_vencidos + total_a_vencer
+    metricas = calcular_metricas(clientes_filtro, vendas_cliente, hoje)
+    total_vencidos = metricas["total_vencidos"]
+    total_a_vencer = metricas["total_a_vencer"]
+    total_geral = metricas["total_geral"]
 
     # ======================= MÉTRICAS PRINCIPAIS =======================
     st.subheader("📊 Métricas Financeiras")
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Valores Vencidos", f"R$ {total_vencidos:,.2f}", 
-                 f"{len(vencidos)} títulos", delta_color="inverse")
+                 f"{metricas['qtd_vencidos']} títulos", delta_color="inverse")
     with col2:
         st.metric("A Vencer", f"R$ {total_a_vencer:,.2f}", 
-                 f"{len(a_vencer)} títulos")
+                 f"{metricas['qtd_a_vencer']} títulos")
     with col3:
         st.metric("Total em Aberto", f"R$ {total_geral:,.2f}", 
-                 categorizar_cliente_por_faturamento(total_geral))
+                 metricas["categoria"])
     
     grafico_regua_faturamento(total_geral)
 
@@ -122,38 +70,35 @@ def exibir_analise_completa(clientes_filtro, vendas_cliente):
         col4, col5, col6 = st.columns(3)
         
         # PMF - Prazo Médio de Faturamento
-        clientes_filtro["Prazo"] = (clientes_filtro["Vencimento"] - clientes_filtro["Dt.Emissão"]).dt.days
-        pmf = (clientes_filtro["Prazo"] * clientes_filtro["Vl.liquido"]).sum() / clientes_filtro["Vl.liquido"].sum()
         with col4:
-            st.metric("PMF (Dias)", f"{pmf:.1f}", help="Prazo Médio de Faturamento")
+            st.metric("PMF (Dias)", f"{metricas['pmf']:.1f}", help="Prazo Médio de Faturamento")
         
         # PMR - Prazo Médio de Recebimento
-        vendas_cliente["Dias Recebimento"] = (vendas_cliente["Dt.pagto"] - vendas_cliente["Vencimento"]).dt.days
-        pmr = (vendas_cliente["Dias Recebimento"] * vendas_cliente["Vl.liquido"]).sum() / vendas_cliente["Vl.liquido"].sum()
         with col5:
-            st.metric("PMR (Dias)", f"{pmr:.1f}", help="Prazo Médio de Recebimento")
+            st.metric("PMR (Dias)", f"{metricas['pmr']:.1f}", help="Prazo Médio de Recebimento")
         
         # DSO
-        dias_periodo = (vendas_cliente["Dt.Emissão"].max() - vendas_cliente["Dt.Emissão"].min()).days
-        fat_diario_medio = vendas_cliente["Vl.liquido"].sum() / dias_periodo if dias_periodo > 0 else 0
-        dso = total_geral / fat_diario_medio if fat_diario_medio > 0 else 0
         with col6:
-            st.metric("DSO (Dias)", f"{dso:.1f}", help="Days Sales Outstanding")
+            st.metric("DSO (Dias)", f"{metricas['dso']:.1f}", help="Days Sales Outstanding")
 
     # ======================= EFICIÊNCIA COBRANÇA =======================
     with st.expander("📈 Eficiência de Cobrança"):
         col7, col8 = st.columns(2)
         
         # CEI
-        total_recebido = vendas_cliente["Vl.pagto"].sum()
-        cei = (total_recebido / total_geral * 100) if total_geral > 0 else 0
         with col7:
-            st.metric("CEI (%)", f"{cei:.1f}", help="Collection Effectiveness Index")
+            st.metric("CEI (%)", f"{metricas['cei']:.1f}", help="Collection Effectiveness Index")
         
         # Turnover
-        turnover = (vendas_cliente["Vl.liquido"].sum() / total_geral) if total_geral > 0 else 0
         with col8:
-            st.metric("Giro Contas Receber", f"{turnover:.2f}x")
+            st.metric("Giro Contas Receber", f"{metricas['turnover']:.2f}x")
+
+    # ======================= SÉRIES ROLANTES =======================
+    with st.expander("📉 Tendência de DSO, CEI e Giro"):
+        if serie.empty:
+            st.info("Sem histórico de vendas para montar as séries.")
+        else:
+            st.pyplot(figura_series_rolantes(serie))
 
     # ======================= ANÁLISE TEMPORAL =======================
     with st.expander("📅 Tendência de Valores"):
@@ -185,27 +130,81 @@ def exibir_analise_completa(clientes_filtro, vendas_cliente):
         col9, col10 = st.columns(2)
         
         # Taxa de Inadimplência
-        inadimplencia = (total_vencidos / total_geral * 100) if total_geral > 0 else 0
         with col9:
-            st.metric("Taxa Inadimplência", f"{inadimplencia:.1f}%")
+            st.metric("Taxa Inadimplência", f"{metricas['inadimplencia']:.1f}%")
         
         # Análise Comparativa
-        desempenho_atual = vendas_cliente["Vl.liquido"].sum()
-        desempenho_anterior = clientes_filtro["Vl.liquido"].sum()
-        variacao = ((desempenho_atual - desempenho_anterior)/desempenho_anterior * 100) if desempenho_anterior > 0 else 0
         with col10:
-            st.metric("Variação Histórica", f"{variacao:.1f}%", 
+            st.metric("Variação Histórica", f"{metricas['variacao']:.1f}%", 
                      help="Comparativo com período anterior")
 
+# Exportações ficam na pasta "static" do app, servida pelo Streamlit em app/static/
+# (requer enableStaticServing em .streamlit/config.toml). O servidor envia o arquivo
+# em partes direto do disco, então a memória não cresce com o tamanho da exportação.
+# A pasta é servida sem autenticação: os títulos trazem CNPJ/CPF e Razão Social e
+# ficam protegidos só pelo nome aleatório do arquivo, por isso a validade é curta.
+PASTA_EXPORTACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "exportacoes")
+VALIDADE_EXPORTACAO = 600  # segundos
+# Limite do servidor estático do Streamlit; acima disso, use a linha de comando
+TAMANHO_MAXIMO_EXPORTACAO = 200 * 1024 * 1024
+
+def limpar_exportacoes_antigas():
+    limite = time.time() - VALIDADE_EXPORTACAO
+    for nome in os.listdir(PASTA_EXPORTACOES):
+        caminho = os.path.join(PASTA_EXPORTACOES, nome)
+        # Outra sessão pode ter apagado o arquivo entre o listdir e o remove
+        try:
+            if os.path.getmtime(caminho) < limite:
+                os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+def link_exportacao(rotulo, nome_arquivo, formato, exportar_fn):
+    """Gera o arquivo em disco com o escritor em streaming e exibe o link de download"""
+    os.makedirs(PASTA_EXPORTACOES, exist_ok=True)
+    limpar_exportacoes_antigas()
+
+    arquivo = f"{nome_arquivo}_{uuid.uuid4().hex}.{formato}"
+    caminho = os.path.join(PASTA_EXPORTACOES, arquivo)
+    exportar_fn(caminho, formato)
+
+    if os.path.getsize(caminho) > TAMANHO_MAXIMO_EXPORTACAO:
+        os.remove(caminho)
+        st.sidebar.warning("Exportação acima de 200 MB: use `python exportacao.py` na linha de comando.")
+        return
+    st.sidebar.markdown(
+        f'<a href="app/static/exportacoes/{arquivo}" download="{nome_arquivo}.{formato}">{rotulo}</a>',
+        unsafe_allow_html=True
+    )
+    st.sidebar.caption(f"Link válido por {VALIDADE_EXPORTACAO // 60} minutos.")
+
+def exibir_exportacao(clientes_df, vendas_df, cliente_selecionado):
+    st.sidebar.subheader("📥 Exportação")
+    formato = st.sidebar.radio("Formato:", ["csv", "xlsx"], horizontal=True)
+
+    if st.sidebar.button("Preparar métricas da carteira"):
+        link_exportacao(
+            "⬇️ Baixar métricas da carteira", "metricas_carteira", formato,
+            lambda caminho, fmt: exportar_metricas_carteira(clientes_df, vendas_df, caminho, fmt)
+        )
+
+    if cliente_selecionado and st.sidebar.button("Preparar títulos do cliente"):
+        link_exportacao(
+            "⬇️ Baixar títulos do cliente", "titulos_cliente", formato,
+            lambda caminho, fmt: exportar_titulos_cliente(clientes_df, cliente_selecionado, caminho, fmt)
+        )
+
 def main():
     st.set_page_config(page_title="Analytics Financeiro", layout="wide")
     
     # Controle de atualização
     if st.sidebar.button("🔄 Atualizar Dados"):
         st.cache_data.clear()
+        motor_series.clear()
     
     # Carregar dados
     clientes_df, vendas_df = carregar_dados()
+    motor = motor_series().atualizar(vendas_df)
     
     # Seletor de cliente
     cliente_selecionado = st.sidebar.selectbox(
@@ -213,6 +212,8 @@ def main():
         options=[""] + clientes_df["Cliente_Fantasia"].unique().tolist(),
         format_func=lambda x: "Selecione..." if x == "" else x
     )
+
+    exibir_exportacao(clientes_df, vendas_df, cliente_selecionado)
     
     if not cliente_selecionado:
         st.info("ℹ️ Selecione um cliente na barra lateral")
@@ -228,7 +229,7 @@ def main():
     
     # Exibição principal
     st.title(f"📊 Análise: {cliente_selecionado}")
-    exibir_analise_completa(cliente_filtro, vendas_cliente)
+    exibir_analise_completa(cliente_filtro, vendas_cliente, motor.serie(cliente_filtro["Cliente"].iloc[0]))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,59 @@
+import os
+import hashlib
+
+import gdown
+import pandas as pd
+
+# URLs dos arquivos (atualize com seus links)
+URL_CLIENTES = 'https://drive.google.com/uc?id=12doumGMLErxW6j1KM5idWHAzXAH1Woqd'
+URL_VENDAS = 'https://drive.google.com/uc?id=1dYHZlfvZlwOhJP1cJlQRbMowoVRBY78N'
+
+
+def _baixar(url, prefixo):
+    """Baixa o arquivo só se ainda não existir localmente e devolve o caminho"""
+    # Gera nomes únicos baseados no conteúdo das URLs
+    caminho = f'{prefixo}_{hashlib.md5(url.encode()).hexdigest()[:8]}.xlsx'
+    if not os.path.exists(caminho):
+        gdown.download(url, caminho, quiet=False)
+    return caminho
+
+
+def _converter(df):
+    df["Vencimento"] = pd.to_datetime(df["Vencimento"], errors='coerce')
+    df["Dt.Emissão"] = pd.to_datetime(df["Dt.Emissão"], errors='coerce')
+    df["Dt.pagto"] = pd.to_datetime(df["Dt.pagto"], errors='coerce')
+    df["Vl.liquido"] = pd.to_numeric(df["Vl.liquido"], errors='coerce')
+
+
+def ler_clientes():
+    """Carrega só a planilha de títulos por cliente"""
+    clientes_df = pd.read_excel(_baixar(URL_CLIENTES, 'clientes'), engine='openpyxl')
+    clientes_df.columns = [
+        "Inativo", "Nro.", "Empresa", "Cliente", "Fantasia", "Referência", "Vencimento",
+        "Vl.liquido", "TD", "Nr.docto", "Dt.pagto", "Vl.pagamento", "TP", "Nr.pagamento",
+        "Conta", "Dt.Emissão", "Cobrança", "Modelo", "Negociação", "Duplicata",
+        "Razão Social", "CNPJ/CPF", "PDD"
+    ]
+    _converter(clientes_df)
+    clientes_df["Vl.pagamento"] = pd.to_numeric(clientes_df["Vl.pagamento"], errors='coerce')
+    clientes_df["Cliente_Fantasia"] = clientes_df["Cliente"] + " - " + clientes_df["Fantasia"]
+    return clientes_df
+
+
+def ler_vendas():
+    """Carrega só a planilha de vendas a crédito"""
+    vendas_df = pd.read_excel(_baixar(URL_VENDAS, 'vendas'), engine='openpyxl')
+    vendas_df.columns = [
+        "Inativo", "Nro.", "Empresa", "Cliente", "Fantasia", "Referência", "Vencimento",
+        "Vl.liquido", "TD", "Nr.docto", "Dt.pagto", "Vl.pagto", "TP", "Nr.pagto",
+        "Conta", "Dt.Emissão", "Cobrança", "Modelo", "Negociação", "Duplicata",
+        "Razão Social", "CNPJ/CPF", "PDD"
+    ]
+    _converter(vendas_df)
+    vendas_df["Vl.pagto"] = pd.to_numeric(vendas_df["Vl.pagto"], errors='coerce')
+    return vendas_df
+
+
+def ler_dados():
+    """Baixa (se preciso) e carrega as planilhas; erros sobem como exceções comuns"""
+    return ler_clientes(), ler_vendas()
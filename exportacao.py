@@ -0,0 +1,145 @@
+import argparse
+import csv
+import sys
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from dados import ler_clientes, ler_dados
+from metricas import calcular_metricas
+
+# Quantidade de linhas lidas do snapshot por vez
+TAMANHO_BLOCO = 5000
+
+# Chave em calcular_metricas -> cabeçalho da coluna exportada
+COLUNAS_METRICAS = [
+    ("qtd_vencidos", "Títulos Vencidos"),
+    ("qtd_a_vencer", "Títulos A Vencer"),
+    ("total_vencidos", "Valores Vencidos"),
+    ("total_a_vencer", "A Vencer"),
+    ("total_geral", "Total em Aberto"),
+    ("categoria", "Categoria"),
+    ("pmf", "PMF (Dias)"),
+    ("pmr", "PMR (Dias)"),
+    ("dso", "DSO (Dias)"),
+    ("cei", "CEI (%)"),
+    ("turnover", "Giro Contas Receber"),
+    ("inadimplencia", "Taxa Inadimplência (%)"),
+    ("variacao", "Variação Histórica (%)"),
+]
+
+
+def _normalizar_valor(valor):
+    """Converte NaN/NaT em célula vazia e tipos numpy em tipos nativos"""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+def iterar_blocos(df, posicoes=None, tamanho_bloco=TAMANHO_BLOCO):
+    """Percorre o DataFrame bloco a bloco, sem copiar o snapshot inteiro"""
+    if posicoes is None:
+        posicoes = np.arange(len(df))
+    for inicio in range(0, len(posicoes), tamanho_bloco):
+        yield df.iloc[posicoes[inicio:inicio + tamanho_bloco]]
+
+
+def gerar_linhas(df, posicoes, tamanho_bloco=TAMANHO_BLOCO):
+    """Gera, linha a linha, as posições selecionadas do DataFrame"""
+    for bloco in iterar_blocos(df, posicoes, tamanho_bloco):
+        for linha in bloco.itertuples(index=False, name=None):
+            yield [_normalizar_valor(valor) for valor in linha]
+
+
+def gerar_metricas_carteira(clientes_df, vendas_df, hoje=None):
+    """Gera uma linha de métricas por cliente, processando um cliente por vez"""
+    hoje = hoje if hoje is not None else pd.Timestamp.today()
+    posicoes_vendas = vendas_df.groupby("Cliente", sort=False).indices
+    sem_vendas = np.array([], dtype=int)
+    for cliente, posicoes in clientes_df.groupby("Cliente").indices.items():
+        clientes_filtro = clientes_df.iloc[posicoes]
+        vendas_cliente = vendas_df.iloc[posicoes_vendas.get(cliente, sem_vendas)]
+        metricas = calcular_metricas(clientes_filtro, vendas_cliente, hoje)
+        linha = [cliente, clientes_filtro["Fantasia"].iloc[0]] + [metricas[chave] for chave, _ in COLUNAS_METRICAS]
+        yield [_normalizar_valor(valor) for valor in linha]
+
+
+def _formatar_csv(valor):
+    """Célula no padrão do Excel pt-BR: vírgula como separador decimal"""
+    if valor is None:
+        return ""
+    if isinstance(valor, float):
+        return np.format_float_positional(valor, trim="-").replace(".", ",")
+    return valor
+
+
+def escrever_csv(linhas, colunas, destino):
+    # ';' + vírgula decimal + BOM: abre direto no Excel em português
+    with open(destino, "w", newline="", encoding="utf-8-sig") as arquivo:
+        escritor = csv.writer(arquivo, delimiter=";")
+        escritor.writerow(colunas)
+        for linha in linhas:
+            escritor.writerow([_formatar_csv(valor) for valor in linha])
+
+
+def escrever_xlsx(linhas, colunas, destino, titulo="Exportação"):
+    # Modo write-only: as linhas vão direto para o disco, sem manter a planilha em memória
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=titulo[:31])
+    ws.append(colunas)
+    for linha in linhas:
+        ws.append(linha)
+    wb.save(destino)
+
+
+def exportar(linhas, colunas, destino, formato="csv", titulo="Exportação"):
+    if formato == "csv":
+        escrever_csv(linhas, colunas, destino)
+    elif formato == "xlsx":
+        escrever_xlsx(linhas, colunas, destino, titulo)
+    else:
+        raise ValueError(f"Formato de exportação não suportado: {formato}")
+
+
+def exportar_titulos_cliente(clientes_df, cliente_fantasia, destino, formato="csv"):
+    posicoes = np.flatnonzero((clientes_df["Cliente_Fantasia"] == cliente_fantasia).to_numpy())
+    if len(posicoes) == 0:
+        raise ValueError(f"Cliente não encontrado: {cliente_fantasia}")
+    exportar(gerar_linhas(clientes_df, posicoes), clientes_df.columns.tolist(), destino, formato, titulo="Títulos")
+
+
+def exportar_metricas_carteira(clientes_df, vendas_df, destino, formato="csv"):
+    linhas = gerar_metricas_carteira(clientes_df, vendas_df)
+    colunas = ["Cliente", "Fantasia"] + [cabecalho for _, cabecalho in COLUNAS_METRICAS]
+    exportar(linhas, colunas, destino, formato, titulo="Métricas")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta títulos de um cliente ou métricas da carteira")
+    parser.add_argument("escopo", choices=["cliente", "carteira"])
+    parser.add_argument("destino", help="Caminho do arquivo de saída")
+    parser.add_argument("--cliente", help="Cliente_Fantasia a exportar (escopo 'cliente')")
+    parser.add_argument("--formato", choices=["csv", "xlsx"], help="Padrão: extensão do destino")
+    args = parser.parse_args(argv)
+
+    formato = args.formato or ("xlsx" if args.destino.lower().endswith(".xlsx") else "csv")
+    if args.escopo == "cliente" and not args.cliente:
+        parser.error("--cliente é obrigatório para o escopo 'cliente'")
+
+    if args.escopo == "cliente":
+        # Títulos só dependem da planilha de clientes; a de vendas nem é baixada
+        try:
+            exportar_titulos_cliente(ler_clientes(), args.cliente, args.destino, formato)
+        except ValueError as e:
+            parser.exit(1, f"Erro: {e}\n")
+    else:
+        clientes_df, vendas_df = ler_dados()
+        exportar_metricas_carteira(clientes_df, vendas_df, args.destino, formato)
+    print(f"Exportação salva em {args.destino}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
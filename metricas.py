@@ -0,0 +1,62 @@
+def categorizar_cliente_por_faturamento(faturamento):
+    categorias = [
+        (10000, 'Até 10 mil'),
+        (50000, '11-50 mil'),
+        (100000, '51-100 mil'),
+        (150000, '101-150 mil'),
+        (350000, '151-350 mil'),
+        (1000000, '351 mil-1 Mi'),
+        (float('inf'), 'Acima de 1 Mi')
+    ]
+    for limite, categoria in categorias:
+        if faturamento <= limite:
+            return categoria
+
+
+def calcular_metricas(clientes_filtro, vendas_cliente, hoje):
+    """Métricas de um cliente, usadas tanto no painel quanto na exportação"""
+    vencidos = clientes_filtro["Vencimento"] < hoje
+    a_vencer = clientes_filtro["Vencimento"] >= hoje
+
+    total_vencidos = clientes_filtro.loc[vencidos, "Vl.liquido"].sum()
+    total_a_vencer = clientes_filtro.loc[a_vencer, "Vl.liquido"].sum()
+    total_geral = total_vencidos + total_a_vencer
+
+    # PMF - Prazo Médio de Faturamento
+    prazo = (clientes_filtro["Vencimento"] - clientes_filtro["Dt.Emissão"]).dt.days
+    soma_titulos = clientes_filtro["Vl.liquido"].sum()
+    pmf = (prazo * clientes_filtro["Vl.liquido"]).sum() / soma_titulos if soma_titulos > 0 else 0
+
+    # PMR - Prazo Médio de Recebimento
+    dias_recebimento = (vendas_cliente["Dt.pagto"] - vendas_cliente["Vencimento"]).dt.days
+    soma_vendas = vendas_cliente["Vl.liquido"].sum()
+    pmr = (dias_recebimento * vendas_cliente["Vl.liquido"]).sum() / soma_vendas if soma_vendas > 0 else 0
+
+    # DSO
+    dias_periodo = (vendas_cliente["Dt.Emissão"].max() - vendas_cliente["Dt.Emissão"].min()).days if len(vendas_cliente) else 0
+    fat_diario_medio = soma_vendas / dias_periodo if dias_periodo > 0 else 0
+    dso = total_geral / fat_diario_medio if fat_diario_medio > 0 else 0
+
+    # CEI e Giro
+    cei = (vendas_cliente["Vl.pagto"].sum() / total_geral * 100) if total_geral > 0 else 0
+    turnover = (soma_vendas / total_geral) if total_geral > 0 else 0
+
+    # Inadimplência e comparativo histórico
+    inadimplencia = (total_vencidos / total_geral * 100) if total_geral > 0 else 0
+    variacao = ((soma_vendas - soma_titulos) / soma_titulos * 100) if soma_titulos > 0 else 0
+
+    return {
+        "qtd_vencidos": int(vencidos.sum()),
+        "qtd_a_vencer": int(a_vencer.sum()),
+        "total_vencidos": total_vencidos,
+        "total_a_vencer": total_a_vencer,
+        "total_geral": total_geral,
+        "categoria": categorizar_cliente_por_faturamento(total_geral),
+        "pmf": pmf,
+        "pmr": pmr,
+        "dso": dso,
+        "cei": cei,
+        "turnover": turnover,
+        "inadimplencia": inadimplencia,
+        "variacao": variacao,
+    }
@@ -0,0 +1,203 @@
+import threading
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# Janelas rolantes (em dias) calculadas por padrão
+JANELAS = (30, 60, 90)
+
+# Eventos mais antigos que isso (em dias antes de hoje) são ignorados
+HORIZONTE_DIAS = 3650
+
+# Nomes das colunas no layout de vendas do app5.py
+COLUNAS_PADRAO = {
+    "cliente": "Cliente",
+    "emissao": "Dt.Emissão",
+    "pagamento": "Dt.pagto",
+    "valor": "Vl.liquido",
+    "recebido": "Vl.pagto",
+}
+
+_EPOCA = pd.Timestamp("1970-01-01")
+# Constante de mistura para diferenciar linhas idênticas repetidas no snapshot
+_MISTURA = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _chaves(vendas_df, colunas):
+    """Identificador de cada linha pelo conteúdo das colunas usadas nas séries"""
+    hashes = pd.util.hash_pandas_object(vendas_df[colunas], index=False).to_numpy()
+    ocorrencia = pd.Series(hashes).groupby(hashes).cumcount().to_numpy().astype(np.uint64)
+    return hashes ^ (ocorrencia * _MISTURA)
+
+
+def _dias(coluna, piso, teto):
+    """Datas como número de dias desde 1970; fora de [piso, teto] vira NaN"""
+    if not pd.api.types.is_datetime64_any_dtype(coluna):
+        coluna = pd.to_datetime(coluna, errors='coerce')
+    datas = coluna.dt.normalize()
+    return (datas - _EPOCA).dt.days.where((datas >= piso) & (datas <= teto))
+
+
+def _calcular(vendas_acum, recebido_acum, janela):
+    """DSO, CEI e giro na janela a partir das somas acumuladas diárias.
+
+    Quando o denominador é zero (ex.: cliente sem vendas na janela) o valor
+    fica NaN, para aparecer como lacuna no gráfico e não como zero.
+    """
+    def defasar(serie):
+        defasada = np.zeros_like(serie)
+        defasada[janela:] = serie[:max(len(serie) - janela, 0)]
+        return defasada
+
+    vendas_janela = vendas_acum - defasar(vendas_acum)
+    recebido_janela = recebido_acum - defasar(recebido_acum)
+    saldo = np.clip(vendas_acum - recebido_acum, 0, None)
+    saldo_inicio = defasar(saldo)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dso = np.where(vendas_janela > 0, saldo / (vendas_janela / janela), np.nan)
+        base_cei = saldo_inicio + vendas_janela
+        cei = np.where(base_cei > 0, recebido_janela / base_cei * 100, np.nan)
+        saldo_medio = (saldo_inicio + saldo) / 2
+        giro = np.where(saldo_medio > 0, vendas_janela / saldo_medio, np.nan)
+    return dso, cei, giro
+
+
+class SerieRolante:
+    """Séries rolantes de DSO, CEI e giro por cliente.
+
+    Guarda, de forma esparsa, os totais diários de vendas (valor por data de
+    emissão) e de recebimentos (valor recebido por data de pagamento) de cada
+    cliente. A série de um cliente é montada sob demanda com somas
+    acumuladas, de modo que qualquer janela sai da diferença entre duas
+    posições do acumulado, e fica em cache até o cliente receber linhas
+    novas. Os nomes das colunas podem ser trocados via 'colunas'
+    (ver COLUNAS_PADRAO).
+    """
+
+    def __init__(self, colunas=None):
+        self.colunas = {**COLUNAS_PADRAO, **(colunas or {})}
+        self.hoje = None
+        self._ultimas_chaves = np.array([], dtype=np.uint64)
+        # Contribuição de cada linha já processada, indexada pela chave
+        self._linhas = pd.DataFrame(columns=["Cliente", "Emissao", "Valor", "Pagto", "Recebido"])
+        # cliente -> (totais de vendas por dia, totais recebidos por dia)
+        self._diario = {}
+        self._cache = {}
+        self._trava = threading.Lock()
+
+    @property
+    def clientes(self):
+        return list(self._diario)
+
+    def atualizar(self, vendas_df, hoje=None):
+        """Sincroniza com o snapshot atual de vendas.
+
+        Só as linhas novas, alteradas ou removidas desde a última chamada são
+        agregadas (linhas a mais em dias antigos e pagamentos lançados com
+        atraso inclusive); um snapshot igual ao anterior não faz nada. Datas
+        depois de 'hoje' ou antes de HORIZONTE_DIAS são ignoradas, e a virada
+        do dia refaz tudo para reavaliar esse intervalo.
+        """
+        hoje = (hoje if hoje is not None else pd.Timestamp.today()).normalize()
+        c = self.colunas
+        chaves = _chaves(vendas_df, [c["cliente"], c["emissao"], c["valor"], c["pagamento"], c["recebido"]])
+
+        with self._trava:
+            if hoje != self.hoje:
+                self.hoje = hoje
+                self._ultimas_chaves = np.array([], dtype=np.uint64)
+                self._linhas = self._linhas.iloc[0:0]
+                self._diario, self._cache = {}, {}
+            elif np.array_equal(chaves, self._ultimas_chaves):
+                return self
+
+            conhecidas = self._linhas.index.to_numpy(dtype=np.uint64)
+            novas = ~np.isin(chaves, conhecidas)
+            removidas = conhecidas[~np.isin(conhecidas, chaves)]
+
+            if len(removidas):
+                self._aplicar(self._linhas.loc[removidas], -1)
+                self._linhas = self._linhas.drop(index=removidas)
+            if novas.any():
+                linhas = self._preparar(vendas_df[novas], chaves[novas])
+                self._aplicar(linhas, 1)
+                self._linhas = pd.concat([self._linhas, linhas]) if len(self._linhas) else linhas
+            self._ultimas_chaves = chaves
+        return self
+
+    def _preparar(self, vendas_df, chaves):
+        c = self.colunas
+        piso = self.hoje - pd.Timedelta(days=HORIZONTE_DIAS)
+        return pd.DataFrame({
+            "Cliente": vendas_df[c["cliente"]].to_numpy(),
+            "Emissao": _dias(vendas_df[c["emissao"]], piso, self.hoje).to_numpy(),
+            "Valor": pd.to_numeric(vendas_df[c["valor"]], errors='coerce').fillna(0).to_numpy(),
+            "Pagto": _dias(vendas_df[c["pagamento"]], piso, self.hoje).to_numpy(),
+            "Recebido": pd.to_numeric(vendas_df[c["recebido"]], errors='coerce').fillna(0).to_numpy(),
+        }, index=pd.Index(chaves))
+
+    def _aplicar(self, linhas, sinal):
+        """Soma (sinal=1) ou subtrai (sinal=-1) as linhas dos totais diários"""
+        alterados = set()
+        for posicao, coluna_dia, coluna_valor in ((0, "Emissao", "Valor"), (1, "Pagto", "Recebido")):
+            agregado = linhas.dropna(subset=["Cliente", coluna_dia]).groupby(["Cliente", coluna_dia])[coluna_valor].sum()
+            clientes = agregado.index.get_level_values(0).tolist()
+            dias = agregado.index.get_level_values(1).astype(int).tolist()
+            for cliente, dia, valor in zip(clientes, dias, (agregado * sinal).tolist()):
+                totais = self._diario.setdefault(cliente, ({}, {}))[posicao]
+                total = totais.get(dia, 0) + valor
+                if abs(total) < 1e-9:
+                    totais.pop(dia, None)
+                else:
+                    totais[dia] = total
+            alterados.update(clientes)
+
+        for cliente in alterados:
+            self._cache.pop(cliente, None)
+            if cliente in self._diario and not any(self._diario[cliente]):
+                del self._diario[cliente]
+
+    def serie(self, cliente, janelas=JANELAS):
+        """Séries de um cliente até hoje, com colunas 'DSO 30d', 'CEI 30d', 'Giro 30d', ..."""
+        with self._trava:
+            if cliente not in self._diario:
+                return pd.DataFrame(index=pd.DatetimeIndex([]))
+            cache = self._cache.setdefault(cliente, {})
+            if tuple(janelas) not in cache:
+                cache[tuple(janelas)] = self._montar(cliente, janelas)
+            return cache[tuple(janelas)].copy()
+
+    def _montar(self, cliente, janelas):
+        vendas_dia, recebido_dia = self._diario[cliente]
+        inicio = min(min(vendas_dia, default=np.inf), min(recebido_dia, default=np.inf))
+        fim = (self.hoje - _EPOCA).days
+        n_dias = fim - int(inicio) + 1
+
+        acumulados = []
+        for totais in (vendas_dia, recebido_dia):
+            diario = np.zeros(n_dias)
+            diario[np.fromiter(totais.keys(), dtype=int, count=len(totais)) - int(inicio)] = list(totais.values())
+            acumulados.append(np.cumsum(diario))
+
+        resultado = pd.DataFrame(index=pd.date_range(_EPOCA + pd.Timedelta(days=int(inicio)), periods=n_dias, freq="D"))
+        for janela in janelas:
+            dso, cei, giro = _calcular(acumulados[0], acumulados[1], janela)
+            resultado[f"DSO {janela}d"] = dso
+            resultado[f"CEI {janela}d"] = cei
+            resultado[f"Giro {janela}d"] = giro
+        return resultado
+
+
+def figura_series_rolantes(serie, janelas=JANELAS):
+    """Gráfico de tendência das séries de um cliente (uma linha por janela)"""
+    fig, axes = plt.subplots(3, 1, figsize=(12, 9), sharex=True)
+    for ax, metrica, unidade in zip(axes, ["DSO", "CEI", "Giro"], ["Dias", "%", "x"]):
+        for janela in janelas:
+            ax.plot(serie.index, serie[f"{metrica} {janela}d"], label=f"{janela} dias")
+        ax.set_title(f"{metrica} rolante")
+        ax.set_ylabel(unidade)
+        ax.legend()
+    fig.tight_layout()
+    return fig
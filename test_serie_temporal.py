@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from serie_temporal import SerieRolante
+
+HOJE = pd.Timestamp("2026-01-20")
+
+
+def _vendas(n=300, semente=0):
+    rng = np.random.default_rng(semente)
+    emissao = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 380, n), "D")
+    pagto = pd.Series(emissao + pd.to_timedelta(rng.integers(10, 90, n), "D"))
+    pagto[rng.random(n) < 0.2] = pd.NaT
+    vendas = pd.DataFrame({
+        "Cliente": rng.choice(list("ABC"), n),
+        "Dt.Emissão": emissao,
+        "Dt.pagto": pagto,
+        "Vl.liquido": rng.random(n) * 1000,
+    })
+    vendas["Vl.pagto"] = np.where(vendas["Dt.pagto"].notna(), vendas["Vl.liquido"], np.nan)
+    return vendas
+
+
+def _assert_igual_reconstrucao(motor, vendas):
+    novo = SerieRolante().atualizar(vendas, hoje=HOJE)
+    assert sorted(motor.clientes) == sorted(novo.clientes)
+    for cliente in novo.clientes:
+        pdt.assert_frame_equal(motor.serie(cliente), novo.serie(cliente))
+
+
+def test_linha_atrasada_em_dia_passado():
+    vendas = _vendas()
+    motor = SerieRolante().atualizar(vendas, hoje=HOJE)
+    motor.serie("A")
+
+    atrasada = pd.DataFrame({
+        "Cliente": ["A", "B"],
+        "Dt.Emissão": [pd.Timestamp("2025-03-10"), pd.Timestamp("2025-01-05")],
+        "Dt.pagto": [pd.NaT, pd.Timestamp("2025-02-01")],
+        "Vl.liquido": [1_000_000.0, 50.0],
+        "Vl.pagto": [np.nan, 50.0],
+    })
+    vendas = pd.concat([vendas, atrasada], ignore_index=True)
+    motor.atualizar(vendas, hoje=HOJE)
+
+    _assert_igual_reconstrucao(motor, vendas)
+
+
+def test_cliente_novo_e_linha_removida():
+    vendas = _vendas()
+    motor = SerieRolante().atualizar(vendas, hoje=HOJE)
+
+    novo_cliente = pd.DataFrame({
+        "Cliente": ["D"],
+        "Dt.Emissão": [pd.Timestamp("2026-01-10")],
+        "Dt.pagto": [pd.NaT],
+        "Vl.liquido": [500.0],
+        "Vl.pagto": [np.nan],
+    })
+    vendas = pd.concat([vendas.iloc[5:], novo_cliente], ignore_index=True)
+    motor.atualizar(vendas, hoje=HOJE)
+
+    assert "D" in motor.clientes
+    _assert_igual_reconstrucao(motor, vendas)
+
+
+def test_datas_futuras_ignoradas():
+    vendas = _vendas()
+    futura = pd.DataFrame({
+        "Cliente": ["A"],
+        "Dt.Emissão": [pd.Timestamp("2099-01-01")],
+        "Dt.pagto": [pd.NaT],
+        "Vl.liquido": [1.0],
+        "Vl.pagto": [np.nan],
+    })
+    motor = SerieRolante().atualizar(pd.concat([vendas, futura], ignore_index=True), hoje=HOJE)
+
+    assert motor.serie("A").index[-1] == HOJE
+    _assert_igual_reconstrucao(motor, vendas)
+
+
+def test_saldo_sem_vendas_na_janela_fica_nan():
+    vendas = pd.DataFrame({
+        "Cliente": ["A"],
+        "Dt.Emissão": [HOJE - pd.Timedelta(days=200)],
+        "Dt.pagto": [pd.NaT],
+        "Vl.liquido": [1000.0],
+        "Vl.pagto": [np.nan],
+    })
+    serie = SerieRolante().atualizar(vendas, hoje=HOJE).serie("A")
+
+    assert np.isnan(serie["DSO 30d"].iloc[-1])
+    assert serie["DSO 30d"].iloc[0] == 1000.0 / (1000.0 / 30)